@@ -1,119 +1,425 @@
 import sys
 import os
 import subprocess
-import glob
 import re
+import codecs
+import struct
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QGridLayout, QGroupBox, QLabel, 
                                QLineEdit, QPushButton, QComboBox, QSpinBox, 
                                QCheckBox, QTextEdit, QFileDialog, QMessageBox,
-                               QProgressBar, QSplitter, QListWidget, QListWidgetItem,
+                               QProgressBar, QSplitter, QListWidget, QAbstractItemView,
                                QScrollArea)
-from PySide6.QtCore import QThread, Signal, Qt
-from PySide6.QtGui import QFont, QPalette, QColor
+from PySide6.QtCore import QThread, QObject, QRunnable, QThreadPool, Signal, Qt
+from PySide6.QtGui import QFont, QPalette, QColor, QTextCursor
 
 try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import SimpleDocTemplate, Image, PageBreak
+    from reportlab.pdfgen import canvas
     from reportlab.lib.utils import ImageReader
+    from reportlab.pdfbase.pdfutils import readJPEGInfo
+    from reportlab.pdfbase.pdfdoc import PDFError
+    from PIL import Image
     PDF_SUPPORT = True
 except ImportError:
     PDF_SUPPORT = False
     print("警告: 未安装reportlab库，PDF生成功能将不可用。请使用 'pip install reportlab' 安装。")
 
+# 合成PDF时收集的图片扩展名（小写，匹配时不区分大小写）
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff'})
+# 同时生成的PDF数量上限
+PDF_MAX_JOBS = 1
+# 生成PDF时在当前页之后后台预取的页数；每页只保留ImageReader缓存的一份RGB数据，
+# 连同当前页，内存中最多有该值加一份整页像素缓冲区
+PDF_PREFETCH_PAGES = 4
+# JPEG文件头标识；reportlab仅对这些扩展名的JPEG按路径原样嵌入
+JPEG_MAGIC = b'\xff\xd8\xff'
+JPEG_EXTENSIONS = ('.jpg', '.jpeg')
 
-def natural_sort_key(s):
+
+# 自然排序用的数字分段正则，预编译以避免每次调用时查找正则缓存
+_NAT_RE = re.compile(r'(\d+)')
+
+
+def _nat_digits(text):
+    """去掉前导零后在数字前加上三位长度，使字符串比较与数值比较结果一致"""
+    digits = text.lstrip('0')
+    return f"{len(digits):03d}{digits}"
+
+
+def natural_sort_key(s, _split=_NAT_RE.split):
     """
-    自然排序键函数，用于对包含数字的字符串进行排序
-    例如：wmakx1263DL_10.jpg -> ['wmakx', 1263, 'DL_', 10, '.jpg']
+    自然排序键函数，用于对包含数字的字符串进行排序（仅比较文件名部分）
+    数字段编码为“长度+数字”的字符串，无需转换为int
+    例如：wmakx1263DL_10.jpg -> ['wmakx', '0041263', 'dl_', '00210', '.jpg']
     """
-    return [int(text) if text.isdigit() else text.lower()
-            for text in re.split(r'(\d+)', str(s))]
+    return [_nat_digits(text) if text.isdigit() else text
+            for text in _split(os.path.basename(s).lower())]
+
+
+def load_pdf_page(img_path):
+    """
+    读取生成PDF页面所需的图片数据，可在后台线程中预取
+    返回 (宽, 高, 绘制源)：JPEG的绘制源为路径，由reportlab原样嵌入；
+    其他格式在此处完成解码和RGB转换，绘制源为已缓存RGB数据的ImageReader
+    """
+    # JPEG只解析文件头获取尺寸，完全不经过PIL；压缩数据由reportlab直接拷贝进PDF
+    if os.path.splitext(img_path)[1].lower() in JPEG_EXTENSIONS:
+        with open(img_path, 'rb') as f:
+            if f.read(len(JPEG_MAGIC)) == JPEG_MAGIC:
+                f.seek(0)
+                try:
+                    # 返回 (宽, 高, 通道数, DPI)
+                    width, height = readJPEGInfo(f)[:2]
+                    return width, height, img_path
+                except (PDFError, struct.error, OSError):
+                    pass  # 文件头无法识别时交给PIL处理
+
+    with Image.open(img_path) as img:
+        if img.format == 'JPEG':
+            return img.width, img.height, img_path
+        # 解码时PIL会释放GIL，可与主线程的PDF写入并行；
+        # drawImage需要RGB数据计算图像摘要，提前转换并缓存在ImageReader中
+        img.load()
+        reader = ImageReader(img)
+        reader.getRGBData()
+    # 离开with后PIL图像已关闭，只保留ImageReader缓存的RGB数据
+    return img.width, img.height, reader
+
+
+def create_pdf_from_directory(input_dir, output_dir, output_base, log):
+    """
+    将目录中的图片按自然排序顺序合并成PDF，每页尺寸精确匹配图片尺寸
+    log为日志回调函数，本函数可在非GUI线程中运行
+    """
+    try:
+        if not PDF_SUPPORT:
+            log("警告: 未安装reportlab库，无法生成PDF")
+            return False
+            
+        # 获取目录中所有图片文件
+        # 单次遍历目录，按小写扩展名过滤，避免在不区分大小写的文件系统上重复计入
+        with os.scandir(output_dir) as entries:
+            image_files = [entry.path for entry in entries
+                           if entry.is_file()
+                           and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS]
+
+        # 使用自然排序对文件名进行排序
+        # list.sort(key=...) 内部即为装饰-排序-去装饰，每个文件只计算一次排序键
+        image_files.sort(key=natural_sort_key)
+
+        if not image_files:
+            log(f"警告: 目录 {output_dir} 中没有找到图片文件")
+            return False
+
+        # 创建PDF文件名
+        dir_name = Path(input_dir).name
+        pdf_path = Path(output_base) / f"{dir_name}.pdf"
+
+        log(f"生成PDF: {pdf_path}，包含 {len(image_files)} 张图片")
+
+        # 创建自定义页面尺寸的PDF，开启页面流压缩，减小文件体积和写盘时间
+        pdf = canvas.Canvas(str(pdf_path), pageCompression=1)
+
+        # 后台线程预取后续几页图片，与当前页的PDF写入重叠
+        prefetch = deque()
+        next_index = 0
+        with ThreadPoolExecutor(max_workers=PDF_PREFETCH_PAGES) as loader:
+            for i, img_path in enumerate(image_files):
+                # 保持当前页之后最多PDF_PREFETCH_PAGES页在预取中
+                while next_index < len(image_files) and next_index < i + 1 + PDF_PREFETCH_PAGES:
+                    prefetch.append(loader.submit(load_pdf_page, image_files[next_index]))
+                    next_index += 1
+
+                try:
+                    log(f"  处理图片 {i+1}/{len(image_files)}: {os.path.basename(img_path)}")
+
+                    # 获取预取线程已读取的图片尺寸和绘制源
+                    # 直接解包结果，不保留Future引用，以免页面数据在本页之后继续驻留内存
+                    img_width, img_height, source = prefetch.popleft().result()
+
+                    # 设置PDF页面尺寸为图片尺寸（以点为单位的尺寸，1点=1/72英寸）
+                    # 假设图片为72DPI，这样像素尺寸就直接对应点尺寸
+                    page_width = img_width
+                    page_height = img_height
+
+                    log(f"    图片尺寸: {img_width} x {img_height} 像素")
+                    log(f"    PDF页面尺寸: {page_width} x {page_height} 点")
+
+                    # 设置页面尺寸
+                    pdf.setPageSize((page_width, page_height))
+
+                    # 将图片绘制到页面上，完全填满页面
+                    pdf.drawImage(source, 0, 0, width=page_width, height=page_height)
+
+                    # 图片数据已写入PDF对象，释放ImageReader缓存的RGB数据
+                    del source
+
+                    # 如果还有更多图片，添加新页面
+                    if i < len(image_files) - 1:
+                        pdf.showPage()
+
+                    log("    ✓ 图片已添加到PDF")
+
+                except Exception as e:
+                    log(f"  错误: 无法处理图片 {img_path}: {str(e)}")
+                    continue
+
+        # 保存PDF
+        pdf.save()
+
+        # 验证生成的PDF（一次stat同时判断存在并获取大小）
+        try:
+            file_size = os.stat(pdf_path).st_size / (1024 * 1024)  # MB
+        except FileNotFoundError:
+            log("✗ PDF文件未成功创建")
+            return False
+
+        log(f"✓ PDF生成成功: {pdf_path} ({file_size:.2f} MB)")
+        log("✓ 所有图片已按原始尺寸插入PDF页面")
+        return True
+
+    except Exception as e:
+        log(f"✗ PDF生成失败: {str(e)}")
+        return False
 
 
 class UpscaylWorker(QThread):
     """工作线程，用于执行Upscayl命令"""
     
+    # 子进程输出管道缓冲区大小
+    PIPE_BUFFER_SIZE = 65536
+    # 每次从管道读取的最大字节数
+    READ_CHUNK_SIZE = 8192
+    # 日志缓冲区刷新间隔（秒）和行数阈值
+    FLUSH_INTERVAL = 0.1
+    FLUSH_LINES = 64
+    
     # 信号定义
     output_signal = Signal(str)
     progress_signal = Signal(int, int)  # 当前进度, 总任务数
     finished_signal = Signal(bool, str)
     directory_finished = Signal(str, str)  # 目录名, 输出目录
     
-    def __init__(self, command, directories, output_base, args):
+    def __init__(self, command, directories, output_base, args, max_jobs=1):
         super().__init__()
         self.command = command
         self.directories = directories
         self.output_base = output_base
         self.args = args
+        # 输入输出路径在参数列表中的位置，每个目录只需替换这两项
+        self._in_idx = args.index("-i") + 1
+        self._out_idx = args.index("-o") + 1
+        self.max_jobs = max(1, max_jobs)  # 同时运行的upscayl进程数
         self.is_running = True
+        self._log_buf = []
+        self._last_flush = time.monotonic()
+        self._log_lock = threading.RLock()
+        self._flush_stop = threading.Event()
+        # 正在运行的子进程，stop()会从GUI线程访问，需要加锁
+        self._procs = set()
+        self._proc_lock = threading.Lock()
+        
+    def _log(self, message):
+        """将日志写入缓冲区，按需批量发送"""
+        if not message.endswith("\n"):
+            message += "\n"
+        with self._log_lock:
+            self._log_buf.append(message)
+            self._maybe_flush()
+        
+    def _maybe_flush(self, force=False):
+        """缓冲区积累足够行数或超过刷新间隔时，合并为一条消息发送"""
+        with self._log_lock:
+            if not self._log_buf:
+                return
+            now = time.monotonic()
+            if (force or len(self._log_buf) >= self.FLUSH_LINES
+                    or now - self._last_flush >= self.FLUSH_INTERVAL):
+                self.output_signal.emit("".join(self._log_buf))
+                self._log_buf.clear()
+                self._last_flush = now
+        
+    def _flush_loop(self):
+        """定时刷新日志缓冲区，子进程暂时没有输出时已缓冲的日志也能及时显示"""
+        while not self._flush_stop.wait(self.FLUSH_INTERVAL):
+            self._maybe_flush(force=True)
         
     def run(self):
+        flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        flusher.start()
+        try:
+            self._run_directories()
+        finally:
+            self._flush_stop.set()
+            flusher.join()
+            
+    def _run_directories(self):
         try:
             total_dirs = len(self.directories)
+            finished = 0
             
-            for i, input_dir in enumerate(self.directories):
-                if not self.is_running:
-                    break
-                    
-                # 为每个输入目录创建对应的输出目录
-                dir_name = Path(input_dir).name
-                output_dir = Path(self.output_base) / dir_name
-                output_dir.mkdir(parents=True, exist_ok=True)
-                
-                self.output_signal.emit(f"处理目录 {i+1}/{total_dirs}: {input_dir}")
-                self.progress_signal.emit(i, total_dirs)
-                
-                # 构建完整的命令
-                dir_args = self.args.copy()
-                
-                # 替换输入输出路径
-                for j, arg in enumerate(dir_args):
-                    if arg == "-i" and j+1 < len(dir_args):
-                        dir_args[j+1] = input_dir
-                    elif arg == "-o" and j+1 < len(dir_args):
-                        dir_args[j+1] = str(output_dir)
-                
-                full_command = [self.command] + dir_args
-                self.output_signal.emit(f"执行命令: {' '.join(full_command)}\n")
-                
-                # 执行命令
-                process = subprocess.Popen(
-                    full_command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    universal_newlines=True,
-                    bufsize=1
-                )
-                
-                # 读取输出
-                for line in process.stdout:
-                    if self.is_running:
-                        self.output_signal.emit(line)
-                    else:
-                        process.terminate()
-                        break
-                        
-                # 等待进程结束
-                process.wait()
-                
-                if process.returncode == 0:
-                    self.output_signal.emit(f"✓ 目录处理完成: {input_dir}\n")
-                    self.directory_finished.emit(input_dir, str(output_dir))
-                else:
-                    self.output_signal.emit(f"✗ 目录处理失败: {input_dir}, 返回码: {process.returncode}\n")
+            # 各目录相互独立，按并行数上限同时启动多个upscayl进程
+            with ThreadPoolExecutor(max_workers=self.max_jobs) as pool:
+                futures = [pool.submit(self._process_directory, i, input_dir, total_dirs)
+                           for i, input_dir in enumerate(self.directories)]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                        finished += 1
+                        self.progress_signal.emit(finished, total_dirs)
+                except BaseException:
+                    # 出错时与用户停止一样处理：终止正在运行的进程，尚未开始的目录直接跳过
+                    self.stop()
+                    raise
             
+            self._maybe_flush(force=True)
             if self.is_running:
                 self.finished_signal.emit(True, f"所有目录处理完成！共处理了 {total_dirs} 个目录。")
             else:
                 self.finished_signal.emit(False, "处理被用户中断")
                 
         except Exception as e:
+            self._maybe_flush(force=True)
             self.finished_signal.emit(False, f"执行错误: {str(e)}")
             
+    def _process_directory(self, i, input_dir, total_dirs):
+        """处理单个输入目录"""
+        if not self.is_running:
+            return
+            
+        # 为每个输入目录创建对应的输出目录
+        dir_name = Path(input_dir).name
+        output_dir = Path(self.output_base) / dir_name
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._log(f"处理目录 {i+1}/{total_dirs}: {input_dir}")
+        
+        # 构建完整的命令，替换输入输出路径
+        dir_args = self.args[:]
+        dir_args[self._in_idx] = input_dir
+        dir_args[self._out_idx] = str(output_dir)
+        
+        full_command = [self.command, *dir_args]
+        self._log(f"执行命令: {' '.join(full_command)}\n")
+        
+        # 执行命令
+        process = subprocess.Popen(
+            full_command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=self.PIPE_BUFFER_SIZE
+        )
+        with self._proc_lock:
+            self._procs.add(process)
+            # 启动期间已请求停止时，stop()看不到此进程，需自行终止
+            if not self.is_running:
+                process.terminate()
+        
+        try:
+            # 以二进制块读取输出，统一按UTF-8增量解码后再拆分为行
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            pending = ""
+            # 多个目录并行时，为每行输出加上目录序号和名称以便区分
+            prefix = f"[{i+1}:{dir_name}] " if self.max_jobs > 1 else ""
+            for chunk in iter(lambda: process.stdout.read1(self.READ_CHUNK_SIZE), b""):
+                if not self.is_running:
+                    process.terminate()
+                    break
+                lines = (pending + decoder.decode(chunk)).splitlines(keepends=True)
+                # 最后一段没有换行符时留待下次读取拼接
+                pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+                for line in lines:
+                    line = line.rstrip("\r\n")
+                    if line:
+                        self._log(prefix + line)
+            else:
+                pending += decoder.decode(b"", final=True)
+                if pending:
+                    self._log(prefix + pending)
+                    
+            # 等待进程结束
+            process.wait()
+        finally:
+            with self._proc_lock:
+                self._procs.discard(process)
+        
+        if process.returncode == 0:
+            self._log(f"✓ 目录处理完成: {input_dir}\n")
+            with self._log_lock:
+                self._maybe_flush(force=True)
+                self.directory_finished.emit(input_dir, str(output_dir))
+        else:
+            self._log(f"✗ 目录处理失败: {input_dir}, 返回码: {process.returncode}\n")
+            self._maybe_flush(force=True)
+            
     def stop(self):
-        self.is_running = False
+        """请求停止处理，并立即终止正在运行的子进程"""
+        with self._proc_lock:
+            self.is_running = False
+            for process in self._procs:
+                process.terminate()
+
+
+class PdfSignals(QObject):
+    """PDF生成任务的信号（QRunnable本身不能定义信号）"""
+    
+    log_signal = Signal(str)
+    finished_signal = Signal(int, bool)  # 任务编号, 是否成功
+
+
+class PdfRunnable(QRunnable):
+    """在线程池中生成PDF，避免阻塞GUI线程"""
+    
+    def __init__(self, job_id, input_dir, output_dir, output_base):
+        super().__init__()
+        self.job_id = job_id
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.output_base = output_base
+        self.signals = PdfSignals()
+        
+    def run(self):
+        success = create_pdf_from_directory(self.input_dir, self.output_dir,
+                                            self.output_base, self.signals.log_signal.emit)
+        self.signals.finished_signal.emit(self.job_id, success)
+
+
+class DirectoryListWidget(QListWidget):
+    """目录列表，支持从文件管理器批量拖放目录"""
+    
+    directories_dropped = Signal(list)  # 拖入的目录列表
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAcceptDrops(True)
+        self.setDragDropMode(QAbstractItemView.DropOnly)
+        
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+        else:
+            super().dragEnterEvent(event)
+            
+    def dragMoveEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+        else:
+            super().dragMoveEvent(event)
+            
+    def dropEvent(self, event):
+        if event.mimeData().hasUrls():
+            dirs = [url.toLocalFile() for url in event.mimeData().urls()
+                    if url.isLocalFile() and os.path.isdir(url.toLocalFile())]
+            if dirs:
+                self.directories_dropped.emit(dirs)
+            event.acceptProposedAction()
+        else:
+            super().dropEvent(event)
 
 
 class UpscaylGUI(QMainWindow):
@@ -122,6 +428,12 @@ class UpscaylGUI(QMainWindow):
     def __init__(self):
         super().__init__()
         self.worker = None
+        self._pdf_jobs = {}  # 任务编号 -> 正在生成PDF的任务
+        self._next_pdf_job_id = 0
+        self._pending_finish = None  # 等待PDF全部完成后再提示的处理结果
+        # PDF生成使用独立的小线程池，限制同时驻留内存的已解码页面数量
+        self._pdf_pool = QThreadPool(self)
+        self._pdf_pool.setMaxThreadCount(PDF_MAX_JOBS)
         self.init_ui()
         
     def init_ui(self):
@@ -129,6 +441,9 @@ class UpscaylGUI(QMainWindow):
         self.setWindowTitle("Upscayl 图形界面 v1.0 - 多目录处理")
         self.setMinimumSize(1000, 800)  # 增加窗口最小尺寸
         
+        # 已添加目录的集合，用于快速判重
+        self._dir_set = set()
+        
         # 创建中央部件
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -174,8 +489,10 @@ class UpscaylGUI(QMainWindow):
         scroll_area.setMinimumHeight(180)  # 增加最小高度
         scroll_area.setMaximumHeight(250)  # 设置最大高度
         
-        self.directories_list = QListWidget()
+        self.directories_list = DirectoryListWidget()
         self.directories_list.setAlternatingRowColors(True)  # 交替行颜色，提高可读性
+        self.directories_list.setToolTip("可将多个目录直接拖放到此处")
+        self.directories_list.directories_dropped.connect(self.add_directories)
         scroll_area.setWidget(self.directories_list)
         
         basic_layout.addWidget(scroll_area, 0, 1, 1, 2)
@@ -291,6 +608,14 @@ class UpscaylGUI(QMainWindow):
         self.threads_edit.setPlaceholderText("load:proc:save")
         advanced_layout.addWidget(self.threads_edit, 7, 1)
         
+        # 并行目录数
+        advanced_layout.addWidget(QLabel("并行目录数:"), 8, 0)
+        self.parallel_spin = QSpinBox()
+        self.parallel_spin.setRange(1, 8)
+        self.parallel_spin.setValue(1)
+        self.parallel_spin.setToolTip("同时处理的目录数量，显存充足时可适当增加")
+        advanced_layout.addWidget(self.parallel_spin, 8, 1)
+        
         # 选项复选框
         option_layout = QHBoxLayout()
         self.tta_checkbox = QCheckBox("TTA模式")
@@ -301,7 +626,7 @@ class UpscaylGUI(QMainWindow):
         option_layout.addWidget(self.verbose_checkbox)
         option_layout.addWidget(self.pdf_checkbox)
         option_layout.addStretch()
-        advanced_layout.addLayout(option_layout, 8, 0, 1, 3)
+        advanced_layout.addLayout(option_layout, 9, 0, 1, 3)
         
         layout.addWidget(advanced_group)
         
@@ -328,6 +653,9 @@ class UpscaylGUI(QMainWindow):
         # 日志文本框 - 改进显示
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
+        # 限制日志最大行数，超出后自动丢弃最早的内容；日志无需撤销记录
+        self.log_text.document().setMaximumBlockCount(5000)
+        self.log_text.setUndoRedoEnabled(False)
         
         # 设置更好的字体
         font = QFont("Consolas", 10)  # 增加字体大小
@@ -420,19 +748,31 @@ class UpscaylGUI(QMainWindow):
             self, 
             "选择输入目录"
         )
-        if dir_path and dir_path not in [self.directories_list.item(i).text() for i in range(self.directories_list.count())]:
-            item = QListWidgetItem(dir_path)
-            self.directories_list.addItem(item)
+        if dir_path:
+            self.add_directories([dir_path])
+            
+    def add_directories(self, dir_paths):
+        """批量添加目录到列表，跳过已存在的目录"""
+        new_dirs = []
+        for dir_path in dir_paths:
+            if dir_path not in self._dir_set:
+                self._dir_set.add(dir_path)
+                new_dirs.append(dir_path)
+        if new_dirs:
+            # 一次性插入，只触发一次行插入通知
+            self.directories_list.addItems(new_dirs)
             
     def remove_directory(self):
         """移除选中的目录"""
         current_row = self.directories_list.currentRow()
         if current_row >= 0:
-            self.directories_list.takeItem(current_row)
+            item = self.directories_list.takeItem(current_row)
+            self._dir_set.discard(item.text())
             
     def clear_directories(self):
         """清空目录列表"""
         self.directories_list.clear()
+        self._dir_set.clear()
             
     def browse_output_base(self):
         """浏览输出基目录"""
@@ -455,11 +795,17 @@ class UpscaylGUI(QMainWindow):
             
     def log_message(self, message):
         """添加日志消息"""
-        self.log_text.append(message)
-        # 自动滚动到底部
-        self.log_text.verticalScrollBar().setValue(
-            self.log_text.verticalScrollBar().maximum()
-        )
+        if not message.endswith("\n"):
+            message += "\n"
+        scroll_bar = self.log_text.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+        # 通过独立光标在文档末尾插入纯文本，避免append逐段换行及移动视图光标引起的滚动
+        cursor = QTextCursor(self.log_text.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(message)
+        # 仅在用户未向上翻看日志时自动滚动到底部
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
         
     def clear_log(self):
         """清空日志"""
@@ -531,89 +877,6 @@ class UpscaylGUI(QMainWindow):
             
         return args
         
-    def create_pdf_from_directory(self, input_dir, output_dir):
-        """将目录中的图片按自然排序顺序合并成PDF，每页尺寸精确匹配图片尺寸"""
-        try:
-            if not PDF_SUPPORT:
-                self.log_message("警告: 未安装reportlab库，无法生成PDF")
-                return False
-                
-            # 获取目录中所有图片文件
-            image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.webp', '*.bmp', '*.tiff']
-            image_files = []
-            for ext in image_extensions:
-                image_files.extend(glob.glob(os.path.join(output_dir, ext)))
-                image_files.extend(glob.glob(os.path.join(output_dir, ext.upper())))
-
-            # 使用自然排序对文件名进行排序
-            image_files.sort(key=natural_sort_key)
-
-            if not image_files:
-                self.log_message(f"警告: 目录 {output_dir} 中没有找到图片文件")
-                return False
-
-            # 创建PDF文件名
-            dir_name = Path(input_dir).name
-            pdf_path = Path(self.output_base_edit.text()) / f"{dir_name}.pdf"
-
-            self.log_message(f"生成PDF: {pdf_path}，包含 {len(image_files)} 张图片")
-
-            # 创建自定义页面尺寸的PDF
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import A4
-            from PIL import Image
-
-            pdf = canvas.Canvas(str(pdf_path))
-
-            for i, img_path in enumerate(image_files):
-                try:
-                    self.log_message(f"  处理图片 {i+1}/{len(image_files)}: {Path(img_path).name}")
-
-                    # 获取图片尺寸
-                    with Image.open(img_path) as img:
-                        img_width, img_height = img.size
-
-                    # 设置PDF页面尺寸为图片尺寸（以点为单位的尺寸，1点=1/72英寸）
-                    # 假设图片为72DPI，这样像素尺寸就直接对应点尺寸
-                    page_width = img_width
-                    page_height = img_height
-
-                    self.log_message(f"    图片尺寸: {img_width} x {img_height} 像素")
-                    self.log_message(f"    PDF页面尺寸: {page_width} x {page_height} 点")
-
-                    # 设置页面尺寸
-                    pdf.setPageSize((page_width, page_height))
-
-                    # 将图片绘制到页面上，完全填满页面
-                    pdf.drawImage(img_path, 0, 0, width=page_width, height=page_height)
-
-                    # 如果还有更多图片，添加新页面
-                    if i < len(image_files) - 1:
-                        pdf.showPage()
-
-                    self.log_message("    ✓ 图片已添加到PDF")
-
-                except Exception as e:
-                    self.log_message(f"  错误: 无法处理图片 {img_path}: {str(e)}")
-                    continue
-
-            # 保存PDF
-            pdf.save()
-
-            # 验证生成的PDF
-            if os.path.exists(pdf_path):
-                file_size = os.path.getsize(pdf_path) / (1024 * 1024)  # MB
-                self.log_message(f"✓ PDF生成成功: {pdf_path} ({file_size:.2f} MB)")
-                self.log_message("✓ 所有图片已按原始尺寸插入PDF页面")
-                return True
-            else:
-                self.log_message("✗ PDF文件未成功创建")
-                return False
-
-        except Exception as e:
-            self.log_message(f"✗ PDF生成失败: {str(e)}")
-            return False
-        
     def start_processing(self):
         """开始处理"""
         if not self.validate_inputs():
@@ -623,6 +886,9 @@ class UpscaylGUI(QMainWindow):
             QMessageBox.warning(self, "处理中", "当前有任务正在运行，请等待完成或停止")
             return
             
+        # 新任务开始时不再提示上一轮的结果
+        self._pending_finish = None
+        
         # 获取目录列表
         directories = [self.directories_list.item(i).text() for i in range(self.directories_list.count())]
         output_base = self.output_base_edit.text()
@@ -632,7 +898,8 @@ class UpscaylGUI(QMainWindow):
         args = self.build_arguments()
         
         # 创建并启动工作线程
-        self.worker = UpscaylWorker(upscayl_bin, directories, output_base, args)
+        self.worker = UpscaylWorker(upscayl_bin, directories, output_base, args,
+                                    self.parallel_spin.value())
         self.worker.output_signal.connect(self.log_message)
         self.worker.progress_signal.connect(self.update_progress)
         self.worker.finished_signal.connect(self.processing_finished)
@@ -660,14 +927,31 @@ class UpscaylGUI(QMainWindow):
         # 如果启用了PDF生成，则创建PDF
         if self.pdf_checkbox.isChecked():
             self.log_message("开始生成PDF...")
-            self.create_pdf_from_directory(input_dir, output_dir)
+            job_id = self._next_pdf_job_id
+            self._next_pdf_job_id += 1
+            runnable = PdfRunnable(job_id, input_dir, output_dir, self.output_base_edit.text())
+            runnable.signals.log_signal.connect(self.log_message)
+            runnable.signals.finished_signal.connect(self.on_pdf_finished)
+            # 保留引用直到任务结束，确保信号对象在线程池运行期间有效
+            self._pdf_jobs[job_id] = runnable
+            self._pdf_pool.start(runnable)
+            
+    def on_pdf_finished(self, job_id, success):
+        """单个目录的PDF生成完成"""
+        self._pdf_jobs.pop(job_id, None)
+        # 目录处理已结束且PDF全部生成完毕时，再弹出完成提示
+        if not self._pdf_jobs and self._pending_finish is not None:
+            finish_success = self._pending_finish
+            self._pending_finish = None
+            self.show_finish_message(finish_success)
         
     def stop_processing(self):
         """停止处理"""
         if self.worker and self.worker.isRunning():
+            # 不在GUI线程中等待工作线程结束，界面由finished_signal恢复
             self.worker.stop()
-            self.worker.wait()
-            self.log_message("⏹️ 处理已停止")
+            self.stop_btn.setEnabled(False)
+            self.log_message("⏹️ 正在停止处理...")
             
     def processing_finished(self, success, message):
         """处理完成回调"""
@@ -676,7 +960,15 @@ class UpscaylGUI(QMainWindow):
         self.progress_bar.setVisible(False)
         
         self.log_message(message)
+        if self._pdf_jobs:
+            self.log_message(f"仍有 {len(self._pdf_jobs)} 个PDF正在后台生成，完成后再提示...")
+            self._pending_finish = success
+            return
+            
+        self.show_finish_message(success)
         
+    def show_finish_message(self, success):
+        """弹出处理结果提示"""
         if success:
             QMessageBox.information(self, "完成", "所有目录处理完成！")
         else: